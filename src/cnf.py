@@ -1,8 +1,18 @@
+from array import array
+from collections import Counter
+from itertools import chain
+import hashlib
+
+
 class CNF:
     def __init__(self, variables, hard_clauses, soft_clauses):
         """
         Initializes a Conjunctive Normal Form (CNF) object.
 
+        The string clauses are compiled once into arrays of signed integers (DIMACS style):
+        every variable gets an index starting at 1, a positive literal is stored as +index
+        and a negated literal as -index. All evaluation is done on this compiled form.
+
         Args:
             variables (list): List of variable names.
             hard_clauses (list): List of hard clauses. Each clause is a list of literals.
@@ -10,64 +20,202 @@ class CNF:
                                  that ends with a weight (int or float).
         """
         self.variables = variables
-        self.hard_clauses = hard_clauses
-        self.soft_clauses = soft_clauses
 
-    def evaluate_clause(self, clause, assignments):
+        # Index 0 is unused so that the sign of a literal can carry its polarity.
+        self.var_names = [None]
+        self.var_index = {}
+        # For every variable: the ids of the clauses containing its positive literal, and of
+        # those containing its negated literal (once per occurrence).
+        self.positive_occurrences = [None]
+        self.negative_occurrences = [None]
+        self.soft_positive_occurrences = [None]
+        self.soft_negative_occurrences = [None]
+        # For every variable: the ids of the hard clauses mentioning it, each listed once.
+        self.var_in_clause = [None]
+        for name in sorted({self.parse_literal(lit)[0] for lit in variables or ()}):
+            self.index_variable(name)
+
+        # Only the compiled clauses are kept; hard_clauses and soft_clauses rebuild the string
+        # form on demand.
+        self.hard = [self.compile_clause(clause) for clause in hard_clauses]
+        self.soft = [self.compile_clause(soft_clause[:-1]) for soft_clause in soft_clauses]
+        self.soft_weights = [int(soft_clause[-1]) for soft_clause in soft_clauses]
+        self.order_literals()
+
+        for clause_id, clause in enumerate(self.hard):
+            for lit in clause:
+                if lit > 0:
+                    self.positive_occurrences[lit].append(clause_id)
+                else:
+                    self.negative_occurrences[-lit].append(clause_id)
+        for clause_id, clause in enumerate(self.soft):
+            for lit in clause:
+                if lit > 0:
+                    self.soft_positive_occurrences[lit].append(clause_id)
+                else:
+                    self.soft_negative_occurrences[-lit].append(clause_id)
+        for index in range(1, len(self.var_names)):
+            self.var_in_clause[index] = sorted(
+                set(self.positive_occurrences[index]) | set(self.negative_occurrences[index]))
+
+    @staticmethod
+    def parse_literal(literal):
         """
-        Checks if a single clause is satisfied given the assignments.
-        A clause is satisfied if at least one of its literals evaluates to True.
+        Splits a literal into its variable name and polarity.
+
+        Args:
+            literal (str): A literal such as 'x1', '~x1', '-x1' or '¬x1'.
+
+        Returns:
+            tuple: (variable name, True if the literal is positive).
+        """
+        name = literal.lstrip('-~¬')
+        return name, len(name) == len(literal)
+
+    def index_variable(self, name):
+        """
+        Returns the index of a variable, registering it if it is not known yet.
+
+        Args:
+            name (str): The name of the variable.
+
+        Returns:
+            int: The index of the variable (starting at 1).
+        """
+        index = self.var_index.get(name)
+        if index is None:
+            index = len(self.var_names)
+            self.var_index[name] = index
+            self.var_names.append(name)
+            self.positive_occurrences.append([])
+            self.negative_occurrences.append([])
+            self.soft_positive_occurrences.append([])
+            self.soft_negative_occurrences.append([])
+            self.var_in_clause.append([])
+        return index
+
+    def compile_clause(self, clause):
+        """
+        Translates a clause of string literals into an array of signed variable indices.
 
         Args:
             clause (list): A list of literals.
-            assignments (dict): A dictionary mapping variable names to booleans.
 
         Returns:
-            bool: True if the clause is satisfied, False otherwise.
+            array: The clause as signed integers (+index for x, -index for ~x).
         """
+        compiled = array('i')
         for literal in clause:
-            
-            if literal.startswith('-') or literal.startswith('~') or literal.startswith('¬'):
-                if self.evaluate_negation(literal, assignments):
-                    return True
-            else:
-                
-                if assignments.get(literal, False):
-                    return True
-        return False
+            name, positive = self.parse_literal(literal)
+            index = self.index_variable(name)
+            compiled.append(index if positive else -index)
+        return compiled
+
+    def order_literals(self):
+        """
+        Reorders the literals of every compiled clause, most frequent literal first.
+
+        A literal that occurs in many clauses is the one a good assignment is most likely to
+        make true, so scans that stop at the first true literal finish earlier on average.
+        The sort is stable; ties keep the order of the input file.
+        """
+        appearances = Counter(chain.from_iterable(chain(self.hard, self.soft)))
+        for clause in chain(self.hard, self.soft):
+            clause[:] = array('i', sorted(clause, key=lambda lit: -appearances[lit]))
 
-    def evaluate_negation(self, literal, assignments):
+    def decompile_clause(self, clause):
         """
-        Checks if a negated literal is satisfied.
-        A literal (e.g., '-x1') is satisfied if the corresponding variable is False.
+        Translates a compiled clause back into string literals.
 
         Args:
-            literal (str): A literal that is expected to be negated.
-            assignments (dict): A dictionary mapping variable names to booleans.
+            clause (array): A compiled clause of signed variable indices.
 
         Returns:
-            bool: True if the negated literal is satisfied, False otherwise.
+            list: The literals of the clause, negated ones prefixed with '~'.
         """
-        
-        var = literal.lstrip('-~¬')
-        
-        return not assignments.get(var, False)
+        names = self.var_names
+        return [names[lit] if lit > 0 else '~' + names[-lit] for lit in clause]
+
+    @property
+    def hard_clauses(self):
+        """
+        list: The hard clauses as lists of string literals.
+        """
+        return [self.decompile_clause(clause) for clause in self.hard]
+
+    @property
+    def soft_clauses(self):
+        """
+        list: The soft clauses as lists of string literals, each ending with its weight.
+        """
+        return [self.decompile_clause(clause) + [weight]
+                for clause, weight in zip(self.soft, self.soft_weights)]
+
+    def __repr__(self):
+        """
+        Returns:
+            str: A readable representation of the formula.
+        """
+        return (f"CNF(variables={self.var_names[1:]!r}, hard_clauses={self.hard_clauses!r}, "
+                f"soft_clauses={self.soft_clauses!r})")
+
+    def signature(self):
+        """
+        Computes a digest of the hard clauses that does not depend on clause or literal order.
+
+        Returns:
+            bytes: The digest of the hard clauses.
+        """
+        clauses = sorted(sorted(set(clause)) for clause in self.hard)
+        digest = hashlib.blake2b(digest_size=16)
+        for clause in clauses:
+            digest.update(array('i', [len(clause)] + clause).tobytes())
+        return digest.digest()
+
+    @property
+    def num_variables(self):
+        """
+        int: The number of distinct variables.
+        """
+        return len(self.var_names) - 1
+
+    def evaluate_clause(self, clause, values, assigned_mask):
+        """
+        Checks if a single clause is satisfied given the assignments.
+        A clause is satisfied if at least one of its literals evaluates to True;
+        literals over unassigned variables are never True.
+
+        Args:
+            clause (array): A compiled clause of signed variable indices.
+            values (bytearray): The value of every variable, indexed by variable index;
+                                0 for unassigned variables.
+            assigned_mask (bytearray): 1 for every variable that has a value.
+
+        Returns:
+            bool: True if the clause is satisfied, False otherwise.
+        """
+        for lit in clause:
+            if lit > 0:
+                if values[lit]:
+                    return True
+            elif assigned_mask[-lit] and not values[-lit]:
+                return True
+        return False
 
-    def calculate_weight(self, assignments):
+    def calculate_weight(self, values, assigned_mask):
         """
         Calculates the total weight of satisfied soft clauses based on the given assignments.
 
         Args:
-            assignments (dict): Dictionary where keys are variable names and values are booleans.
+            values (bytearray): The value of every variable, indexed by variable index;
+                                0 for unassigned variables.
+            assigned_mask (bytearray): 1 for every variable that has a value.
 
         Returns:
             int or float: The sum of weights for all soft clauses that are satisfied.
         """
         total_weight = 0
-        for soft_clause in self.soft_clauses:
-            
-            weight = int(soft_clause[-1])
-            clause = soft_clause[:-1]
-            if self.evaluate_clause(clause, assignments):
+        for clause, weight in zip(self.soft, self.soft_weights):
+            if self.evaluate_clause(clause, values, assigned_mask):
                 total_weight += weight
         return total_weight
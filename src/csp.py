@@ -1,8 +1,14 @@
 from cnf import CNF
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from nogood_cache import NogoodCache
 import logging
+import multiprocessing
+import os
 
 class CSP:
-    def __init__(self, cnf: CNF, use_mcv=True, use_mrv=True, use_lcv=True):
+    def __init__(self, cnf: CNF, use_mcv=True, use_mrv=True, use_lcv=True, nogood_cache_path=None):
         """
         Initializes a Constraint Satisfaction Problem (CSP) solver.
 
@@ -11,14 +17,16 @@ class CSP:
             use_mcv (bool): Whether to use Most Constraining Variable (MCV) or not. Defaults to True.
             use_mrv (bool): Whether to use Minimum Remaining Value (MRV) or not. Defaults to True.
             use_lcv (bool): Whether to use Least Constraining Value (LCV) or not. Defaults to True.
+            nogood_cache_path (str): SQLite file in which partial assignments proven unsatisfiable
+                                     are kept across runs. Defaults to None (no cache).
         """
         self.cnf = cnf
         self.use_mcv = use_mcv
         self.use_mrv = use_mrv
         self.use_lcv = use_lcv
+        self.nogood_cache_path = nogood_cache_path
         self.degree_variables = {}
         self.variables = {}  
-        self.assigned_variables = {}  
         self.constraints = []  
         self.var_constraints = {} 
         
@@ -27,10 +35,56 @@ class CSP:
             raise ValueError("MRV and MCV cannot be used together. Please select one heuristic.")
 
         
-        if cnf and cnf.variables:
-            real_vars = {lit.strip('~') for lit in cnf.variables}
-            for var in real_vars:
+        if cnf:
+            for var in cnf.var_names[1:]:
                 self.variables[var] = [False, True]  
+                self.var_constraints[var] = []
+
+        # Variable values and the "is assigned" flags, both indexed by CNF variable index.
+        size = len(cnf.var_names) if cnf else 1
+        self.values = bytearray(size)
+        self.assigned_mask = bytearray(size)
+        if cnf:
+            self.reset()
+
+    def reset(self):
+        """
+        Clears the assignment and rebuilds the per-clause counters.
+
+        For every clause the solver tracks how many of its literals are still unassigned and
+        how many are already true, so that assigning a variable only touches the clauses it
+        appears in. A hard clause is violated exactly when both counters are zero.
+
+        Clauses learned from conflicts are appended after the hard clauses of the CNF and are
+        discarded here, so every solve starts from the original problem.
+        """
+        self.values[:] = bytes(len(self.values))
+        self.assigned_mask[:] = bytes(len(self.assigned_mask))
+        self.num_assigned = 0
+        self.clauses = list(self.cnf.hard)
+        self.positive_occurrences = [None] + [
+            list(occurrences) for occurrences in self.cnf.positive_occurrences[1:]]
+        self.negative_occurrences = [None] + [
+            list(occurrences) for occurrences in self.cnf.negative_occurrences[1:]]
+        # (clause id, LBD) of every learned clause still in use.
+        self.learned = []
+        self.max_learned = MAX_LEARNED_CLAUSES
+        self.conflict_clause = None
+        self.num_unassigned = [len(clause) for clause in self.cnf.hard]
+        self.num_true_literals = [0] * len(self.cnf.hard)
+        self.num_violated = self.num_unassigned.count(0)
+        self.soft_num_unassigned = [len(clause) for clause in self.cnf.soft]
+        self.soft_num_true_literals = [0] * len(self.cnf.soft)
+        # Weight of the soft clauses that are satisfied or can still be satisfied; a soft
+        # clause leaves the bound once all its literals are assigned and false.
+        self.current_bound = sum(compress(self.cnf.soft_weights, self.soft_num_unassigned))
+        # Indices of the variables assigned by the search, in assignment order; undone by popping.
+        self.trail = []
+        # Decision level at which every variable was assigned, and the clause that forced it
+        # (None for decisions).
+        self.decision_level = 0
+        self.level = [0] * len(self.values)
+        self.reason = [None] * len(self.values)
 
     def add_variable(self, variable, domain):
         """
@@ -41,6 +95,15 @@ class CSP:
             domain ([bool]): The domain of the variable (in this case, [False, True]).
         """
         self.variables[variable] = domain
+        self.var_constraints.setdefault(variable, [])
+        index = self.cnf.index_variable(variable)
+        if index >= len(self.values):
+            self.values.append(0)
+            self.assigned_mask.append(0)
+            self.positive_occurrences.append([])
+            self.negative_occurrences.append([])
+            self.level.append(0)
+            self.reason.append(None)
 
     def add_constraint(self, constraint_function, variables):
         """
@@ -66,7 +129,7 @@ class CSP:
             variable (str): The name of the variable.
             value (bool): The assigned value for the variable.
         """
-        self.assigned_variables[variable] = value
+        self.assign_index(self.cnf.var_index[variable], value)
 
     def unassign(self, variable):
         """
@@ -75,22 +138,377 @@ class CSP:
         Args:
             variable (str): The name of the variable.
         """
-        if variable in self.assigned_variables:
-            del self.assigned_variables[variable]
+        self.unassign_index(self.cnf.var_index[variable])
+
+    def assign_index(self, index, value):
+        """
+        Assigns a specific value to the variable with the given index.
+
+        Args:
+            index (int): The CNF index of the variable.
+            value (bool): The assigned value for the variable.
+        """
+        if self.assigned_mask[index]:
+            self.unassign_index(index)
+        self.values[index] = value
+        self.assigned_mask[index] = 1
+        self.num_assigned += 1
+
+        # Split by polarity up front so the loops below need no per-literal comparison.
+        if value:
+            made_true = self.positive_occurrences[index]
+            made_false = self.negative_occurrences[index]
+            soft_made_true = self.cnf.soft_positive_occurrences[index]
+            soft_made_false = self.cnf.soft_negative_occurrences[index]
+        else:
+            made_true = self.negative_occurrences[index]
+            made_false = self.positive_occurrences[index]
+            soft_made_true = self.cnf.soft_negative_occurrences[index]
+            soft_made_false = self.cnf.soft_positive_occurrences[index]
+
+        num_unassigned = self.num_unassigned
+        num_true = self.num_true_literals
+        for clause_id in made_true:
+            num_unassigned[clause_id] -= 1
+            num_true[clause_id] += 1
+        for clause_id in made_false:
+            num_unassigned[clause_id] -= 1
+            if not num_unassigned[clause_id] and not num_true[clause_id]:
+                self.num_violated += 1
+                self.conflict_clause = clause_id
+
+        num_unassigned = self.soft_num_unassigned
+        num_true = self.soft_num_true_literals
+        for clause_id in soft_made_true:
+            num_unassigned[clause_id] -= 1
+            num_true[clause_id] += 1
+        for clause_id in soft_made_false:
+            num_unassigned[clause_id] -= 1
+            if not num_unassigned[clause_id] and not num_true[clause_id]:
+                self.current_bound -= self.cnf.soft_weights[clause_id]
+
+    def unassign_index(self, index):
+        """
+        Unassigns a previously assigned value from the variable with the given index.
+
+        Args:
+            index (int): The CNF index of the variable.
+        """
+        if not self.assigned_mask[index]:
+            return
+        if self.values[index]:
+            made_true = self.positive_occurrences[index]
+            made_false = self.negative_occurrences[index]
+            soft_made_true = self.cnf.soft_positive_occurrences[index]
+            soft_made_false = self.cnf.soft_negative_occurrences[index]
+        else:
+            made_true = self.negative_occurrences[index]
+            made_false = self.positive_occurrences[index]
+            soft_made_true = self.cnf.soft_negative_occurrences[index]
+            soft_made_false = self.cnf.soft_positive_occurrences[index]
+
+        num_unassigned = self.num_unassigned
+        num_true = self.num_true_literals
+        for clause_id in made_true:
+            num_true[clause_id] -= 1
+            num_unassigned[clause_id] += 1
+        for clause_id in made_false:
+            if not num_unassigned[clause_id] and not num_true[clause_id]:
+                self.num_violated -= 1
+            num_unassigned[clause_id] += 1
+
+        num_unassigned = self.soft_num_unassigned
+        num_true = self.soft_num_true_literals
+        for clause_id in soft_made_true:
+            num_true[clause_id] -= 1
+            num_unassigned[clause_id] += 1
+        for clause_id in soft_made_false:
+            if not num_unassigned[clause_id] and not num_true[clause_id]:
+                self.current_bound += self.cnf.soft_weights[clause_id]
+            num_unassigned[clause_id] += 1
+
+        self.values[index] = 0
+        self.assigned_mask[index] = 0
+        self.num_assigned -= 1
+
+    def push_assignment(self, variable, value):
+        """
+        Assigns a value to a variable and records it on the trail.
+
+        Args:
+            variable (str): The name of the variable.
+            value (bool): The assigned value for the variable.
+        """
+        index = self.cnf.var_index[variable]
+        self.assign_index(index, value)
+        self.trail.append(index)
+        self.level[index] = self.decision_level
+        self.reason[index] = None
+
+    def undo_to(self, mark):
+        """
+        Unassigns every variable pushed on the trail after the given mark.
+
+        Args:
+            mark (int): The trail length to go back to.
+        """
+        trail = self.trail
+        unassign_index = self.unassign_index
+        while len(trail) > mark:
+            unassign_index(trail.pop())
+
+    def force_unit(self, clause_id):
+        """
+        Assigns the only unassigned literal of a unit hard clause so that it becomes true.
+
+        Args:
+            clause_id (int): The id of a hard or learned clause with one unassigned literal and no
+                             true one.
+
+        Returns:
+            bool: True if the forced assignment keeps the assignment consistent, False otherwise.
+        """
+        mask = self.assigned_mask
+        for lit in self.clauses[clause_id]:
+            if not mask[abs(lit)]:
+                break
+        index = abs(lit)
+        self.assign_index(index, lit > 0)
+        self.trail.append(index)
+        self.level[index] = self.decision_level
+        self.reason[index] = clause_id
+        return self.is_satisfiable_so_far(self.cnf.var_names[index])
+
+    def propagate(self, start):
+        """
+        Runs unit propagation over the assignments on the trail from position start onwards.
 
-    def is_constraint_satisfied(self, constraint):
+        Whenever an assignment makes a literal false and leaves its hard clause with a single
+        unassigned literal and no true one, that literal is forced. Forced assignments are
+        appended to the trail, which doubles as the propagation queue, so they are undone
+        together with the decision that caused them.
+
+        Args:
+            start (int): Trail position of the first assignment to propagate.
+
+        Returns:
+            bool: False if propagation ran into a conflict, True otherwise.
+        """
+        trail = self.trail
+        values = self.values
+        positive_occurrences = self.positive_occurrences
+        negative_occurrences = self.negative_occurrences
+        num_unassigned = self.num_unassigned
+        num_true = self.num_true_literals
+        force_unit = self.force_unit
+        head = start
+        while head < len(trail):
+            index = trail[head]
+            head += 1
+            if values[index]:
+                made_false = negative_occurrences[index]
+            else:
+                made_false = positive_occurrences[index]
+            for clause_id in made_false:
+                if num_unassigned[clause_id] == 1 and not num_true[clause_id]:
+                    if not force_unit(clause_id):
+                        return False
+        return True
+
+    def propagate_all(self):
+        """
+        Runs unit propagation from scratch: forces the literals of every hard clause that is
+        unit under the current assignment, then propagates their consequences.
+
+        Returns:
+            bool: False if propagation ran into a conflict, True otherwise.
+        """
+        start = len(self.trail)
+        num_unassigned = self.num_unassigned
+        num_true = self.num_true_literals
+        for clause_id in range(len(self.clauses)):
+            if self.clauses[clause_id] is not None and num_unassigned[clause_id] == 1 \
+                    and not num_true[clause_id]:
+                if not self.force_unit(clause_id):
+                    return False
+        return self.propagate(start)
+
+    def analyze_conflict(self, clause_id):
+        """
+        Derives a learned clause from a violated clause (first unique implication point).
+
+        The violated clause is resolved with the reasons of its literals assigned at the current
+        decision level, newest first, until a single literal of that level is left. Every
+        literal of the result is false under the current assignment, and the clause follows
+        from the hard clauses alone.
+
+        Args:
+            clause_id (int): The id of a violated hard or learned clause.
+
+        Returns:
+            [int]: The learned clause as signed variable indices.
+        """
+        level = self.level
+        reason = self.reason
+        trail = self.trail
+        current_level = self.decision_level
+        seen = set()
+        learned = []
+        pending = 0
+        position = len(trail)
+        while True:
+            for lit in self.clauses[clause_id]:
+                index = abs(lit)
+                if index in seen:
+                    continue
+                seen.add(index)
+                if level[index] == current_level:
+                    pending += 1
+                else:
+                    learned.append(lit)
+
+            # Assignments of the current level are the last ones on the trail.
+            position -= 1
+            while trail[position] not in seen:
+                position -= 1
+            index = trail[position]
+            pending -= 1
+            if pending == 0:
+                break
+            clause_id = reason[index]
+
+        learned.append(-index if self.values[index] else index)
+        return learned
+
+    def add_learned_clause(self, literals):
+        """
+        Adds a learned clause to the clauses checked and propagated by the search.
+
+        Args:
+            literals ([int]): The clause as signed variable indices.
+        """
+        clause_id = len(self.clauses)
+        clause = array('i', literals)
+        self.clauses.append(clause)
+
+        unassigned = 0
+        true_literals = 0
+        for lit in clause:
+            index = abs(lit)
+            if lit > 0:
+                self.positive_occurrences[index].append(clause_id)
+            else:
+                self.negative_occurrences[index].append(clause_id)
+            if not self.assigned_mask[index]:
+                unassigned += 1
+            elif (lit > 0) == self.values[index]:
+                true_literals += 1
+        self.num_unassigned.append(unassigned)
+        self.num_true_literals.append(true_literals)
+        if not unassigned and not true_literals:
+            self.num_violated += 1
+
+        lbd = len({self.level[abs(lit)] for lit in clause})
+        self.learned.append((clause_id, lbd))
+
+    def reduce_learned(self):
+        """
+        Forgets the learned clauses of highest LBD (number of distinct decision levels in the
+        clause) once there are too many of them.
+
+        Half of the learned clauses are kept, plus every clause with an LBD of at most two and
+        every clause that is the reason of a current assignment. Must be called while no clause
+        is violated.
+        """
+        locked = {self.reason[index] for index in self.trail}
+        self.learned.sort(key=lambda item: item[1])
+        keep = len(self.learned) // 2
+        kept = []
+        removed = set()
+        for position, (clause_id, lbd) in enumerate(self.learned):
+            if position < keep or lbd <= 2 or clause_id in locked:
+                kept.append((clause_id, lbd))
+            else:
+                removed.add(clause_id)
+
+        touched = {abs(lit) for clause_id in removed for lit in self.clauses[clause_id]}
+        for index in touched:
+            self.positive_occurrences[index] = [
+                clause_id for clause_id in self.positive_occurrences[index]
+                if clause_id not in removed]
+            self.negative_occurrences[index] = [
+                clause_id for clause_id in self.negative_occurrences[index]
+                if clause_id not in removed]
+        for clause_id in removed:
+            self.clauses[clause_id] = None
+
+        self.learned = kept
+        self.max_learned += self.max_learned // 10
+
+    def is_assigned(self, variable):
+        """
+        Checks if a variable currently has a value.
+
+        Args:
+            variable (str): The name of the variable.
+
+        Returns:
+            bool: True if the variable is assigned, False otherwise.
+        """
+        return bool(self.assigned_mask[self.cnf.var_index[variable]])
+
+    def trail_literals(self):
+        """
+        Lists the assignments on the trail as signed variable indices.
+
+        Returns:
+            [int]: +index for a variable assigned True, -index for one assigned False.
+        """
+        values = self.values
+        return [index if values[index] else -index for index in self.trail]
+
+    def open_nogood_cache(self):
+        """
+        Opens the nogood cache configured for this solver.
+
+        The cache only describes the hard clauses, so it is not used when constraints were
+        added with add_constraint.
+
+        Returns:
+            NogoodCache: The opened cache, or None if there is none to use.
+        """
+        if self.nogood_cache_path is None or self.constraints:
+            return None
+        return NogoodCache(self.nogood_cache_path, self.cnf.signature())
+
+    def assignment(self):
+        """
+        Builds the current assignment as a dictionary.
+
+        Returns:
+            dict: A dictionary mapping every assigned variable name to its boolean value.
+        """
+        names = self.cnf.var_names
+        return {names[i]: bool(self.values[i])
+                for i in range(1, len(names)) if self.assigned_mask[i]}
+
+    def is_constraint_satisfied(self, constraint, assignment=None):
         """
         Checks if a specific constraint is satisfied given the current assignment of variables.
 
         Args:
             constraint: A tuple containing the constraint function and the list of involved variables.
+            assignment (dict): The current assignment, if the caller already built it.
+                               Defaults to None.
 
         Returns:
             bool: True if the constraint is satisfied, False otherwise.
         """
         func, vars_in_constraint = constraint
-        if all(var in self.assigned_variables for var in vars_in_constraint):
-            return func(self.assigned_variables)
+        assigned_mask = self.assigned_mask
+        var_index = self.cnf.var_index
+        if all(assigned_mask[var_index[var]] for var in vars_in_constraint):
+            return func(assignment if assignment is not None else self.assignment())
         return True
 
     def is_consistent(self, variable, value):
@@ -104,27 +522,18 @@ class CSP:
         Returns:
             bool: True if the assignment does not violate any constraints, False otherwise.
         """
-        temp_assignment = self.assigned_variables.copy()
-        temp_assignment[variable] = value
-        
-       
-        fully_assigned = list(filter(
-            lambda clause: all(lit.strip('~') in temp_assignment for lit in clause),
-            self.cnf.hard_clauses
-        ))
-        unsatisfied = list(filter(
-            lambda clause: not self.cnf.evaluate_clause(clause, temp_assignment),
-            fully_assigned
-        ))
-        if unsatisfied:
-            return False
-
-        
-        for constraint in self.constraints:
-            if not self.is_constraint_satisfied(constraint):
-                return False
-
-        return True
+        if self.is_assigned(variable):
+            old_value = bool(self.values[self.cnf.var_index[variable]])
+            self.assign(variable, value)
+            consistent = self.is_satisfiable_so_far()
+            self.assign(variable, old_value)
+            return consistent
+
+        mark = len(self.trail)
+        self.push_assignment(variable, value)
+        consistent = self.is_satisfiable_so_far()
+        self.undo_to(mark)
+        return consistent
 
     def is_complete(self):
         """
@@ -133,7 +542,18 @@ class CSP:
         Returns:
             bool: True if the assignment is complete, False otherwise.
         """
-        return len(self.assigned_variables) == len(self.variables)
+        return self.num_assigned == len(self.assigned_mask) - 1
+
+    def unassigned_variables(self):
+        """
+        Lists the variables that have no value yet, in variable index order.
+
+        Returns:
+            [str]: The names of the unassigned variables.
+        """
+        names = self.cnf.var_names
+        mask = self.assigned_mask
+        return [names[index] for index in range(1, len(names)) if not mask[index]]
 
     def minimum_remaining_value(self):
         """
@@ -142,18 +562,28 @@ class CSP:
         Returns:
             str: The name of the selected variable.
         """
-        unassigned = [var for var in self.variables if var not in self.assigned_variables]
+        mask = self.assigned_mask
+        assign_index = self.assign_index
+        unassign_index = self.unassign_index
+        is_satisfiable_so_far = self.is_satisfiable_so_far
+        names = self.cnf.var_names
         min_legal = 3  
         selected = None
-        for var in unassigned:
+        for index in range(1, len(mask)):
+            if mask[index]:
+                continue
             legal = 0
-            for value in [True, False]:
-                if self.is_consistent(var, value):
+            for value in (True, False):
+                assign_index(index, value)
+                if is_satisfiable_so_far(names[index]):
                     legal += 1
+                unassign_index(index)
             if legal < min_legal:
                 min_legal = legal
-                selected = var
-        return selected
+                selected = index
+                if legal == 0:
+                    break
+        return None if selected is None else self.cnf.var_names[selected]
 
     def most_constraining_variable(self, unassigned_variables):
         """
@@ -167,12 +597,13 @@ class CSP:
         """
         max_degree = -1
         selected = None
+        var_index = self.cnf.var_index
+        var_in_clause = self.cnf.var_in_clause
+        clause_sat = self.num_true_literals
         for var in unassigned_variables:
             degree = 0
-            for clause in self.cnf.hard_clauses:
-                if self.cnf.evaluate_clause(clause, self.assigned_variables):
-                    continue
-                if var in clause or ('~' + var) in clause:
+            for clause_id in var_in_clause[var_index[var]]:
+                if not clause_sat[clause_id]:
                     degree += 1
             if degree > max_degree:
                 max_degree = degree
@@ -189,17 +620,20 @@ class CSP:
         Returns:
             bool: The least constraining value for the variable.
         """
-        scores = {}
-        for value in [True, False]:
-            temp_assign = self.assigned_variables.copy()
-            temp_assign[var] = value
-            violation = 0
-            for clause in self.cnf.hard_clauses:
-                fully_assigned = all(lit.strip('~') in temp_assign for lit in clause)
-                if fully_assigned and not self.cnf.evaluate_clause(clause, temp_assign):
-                    violation += 1
-            scores[value] = violation
-        return True if scores[True] <= scores[False] else False
+        # A clause of the variable is violated by one of its values exactly when the variable's
+        # literal is the last unassigned one and nothing else in the clause is true.
+        num_unassigned = self.num_unassigned
+        num_true = self.num_true_literals
+        index = self.cnf.var_index[var]
+        violations_true = 0
+        for clause_id in self.negative_occurrences[index]:
+            if num_unassigned[clause_id] == 1 and not num_true[clause_id]:
+                violations_true += 1
+        violations_false = 0
+        for clause_id in self.positive_occurrences[index]:
+            if num_unassigned[clause_id] == 1 and not num_true[clause_id]:
+                violations_false += 1
+        return violations_true <= violations_false
 
     def select_unassigned_variable(self):
         """
@@ -208,7 +642,7 @@ class CSP:
         Returns:
             str: The name of the selected variable.
         """
-        unassigned = [var for var in self.variables if var not in self.assigned_variables]
+        unassigned = self.unassigned_variables()
         
       
         if self.use_mrv:
@@ -224,24 +658,80 @@ class CSP:
         
         return unassigned[0] if unassigned else None
 
-    def optimistic_bound(self, assignments):
+    def optimistic_bound(self):
         """
         Computes an optimistic bound for the current partial assignment.
-        
+
+        The weight of the soft clauses that are not falsified yet is maintained incrementally
+        by assign/unassign; this already drops every soft clause whose literals were all made
+        false, including by unit propagation. On top of that, a soft clause with no true
+        literal and a single unassigned one is decided by that variable alone. When an
+        unassigned variable decides such clauses in both polarities, whichever value it gets
+        loses the lighter side, so that weight is subtracted as well. Every such clause is
+        decided by exactly one variable, so the subtractions never overlap.
+
         Returns:
             int: optimistic bound.
         """
-        bound = 0
-        for clause in self.cnf.soft_clauses:
-            literals = clause[:-1]
-            weight = int(clause[-1])
-            if all(lit.strip('~') in assignments for lit in literals):
-                if self.cnf.evaluate_clause(literals, assignments):
-                    bound += weight
-            else:
-                bound += weight
+        bound = self.current_bound
+        num_unassigned = self.soft_num_unassigned
+        num_true = self.soft_num_true_literals
+        weights = self.cnf.soft_weights
+        positive_occurrences = self.cnf.soft_positive_occurrences
+        negative_occurrences = self.cnf.soft_negative_occurrences
+        assigned_mask = self.assigned_mask
+        for index in range(1, len(assigned_mask)):
+            if assigned_mask[index]:
+                continue
+            lost_if_false = 0
+            for clause_id in positive_occurrences[index]:
+                if num_unassigned[clause_id] == 1 and not num_true[clause_id]:
+                    lost_if_false += weights[clause_id]
+            if not lost_if_false:
+                continue
+            lost_if_true = 0
+            for clause_id in negative_occurrences[index]:
+                if num_unassigned[clause_id] == 1 and not num_true[clause_id]:
+                    lost_if_true += weights[clause_id]
+            bound -= min(lost_if_false, lost_if_true)
         return bound
 
+    def satisfied_weight(self):
+        """
+        Computes the total weight of the soft clauses satisfied by the current assignment.
+
+        Returns:
+            int: The weight of the satisfied soft clauses.
+        """
+        return sum(compress(self.cnf.soft_weights, self.soft_num_true_literals))
+
+    def is_satisfiable_so_far(self, variable=None):
+        """
+        Checks if the current assignment violates no hard clause and no added constraint.
+
+        Args:
+            variable (str): The variable assigned last, when the assignment without it is known
+                            to be consistent. Only the constraints on this variable can have
+                            become violated, so only those are checked. Defaults to None.
+
+        Returns:
+            bool: True if the current assignment is consistent, False otherwise.
+        """
+        if self.num_violated:
+            return False
+
+        if variable is None:
+            constraints = self.constraints
+        else:
+            constraints = self.var_constraints[variable]
+        if constraints:
+            assignment = self.assignment()
+            for constraint in constraints:
+                if not self.is_constraint_satisfied(constraint, assignment):
+                    return False
+
+        return True
+
     def solve(self):
         """
         Solves the CSP problem using backtracking search with added filtering:
@@ -253,47 +743,238 @@ class CSP:
         """
         self.best_solution = None
         self.best_weight = -1
-        self.assigned_variables = {}
-
-        def backtrack():
-           
-            fully_assigned = list(filter(
-                lambda clause: all(lit.strip('~') in self.assigned_variables for lit in clause),
-                self.cnf.hard_clauses
-            ))
-            unsatisfied = list(filter(
-                lambda clause: not self.cnf.evaluate_clause(clause, self.assigned_variables),
-                fully_assigned
-            ))
-            if unsatisfied:
-                return
-
-            current_bound = self.optimistic_bound(self.assigned_variables)
-            if current_bound <= self.best_weight:
-                return
-
-            if self.is_complete():
-                current_weight = self.cnf.calculate_weight(self.assigned_variables)
-                if current_weight > self.best_weight:
-                    self.best_weight = current_weight
-                    self.best_solution = self.assigned_variables.copy()
-                return
-
-            var = self.select_unassigned_variable()
-            if var is None:
-                return
-
-            if self.use_lcv:
-                preferred_value = self.least_constraining_value(var)
-                values = [preferred_value, not preferred_value]
-            else:
-                values = [True, False]
+        self.reset()
+        nogood_cache = self.open_nogood_cache()
+        try:
+            self.search(nogood_cache=nogood_cache)
+        finally:
+            if nogood_cache is not None:
+                nogood_cache.close()
+        return self.best_solution, self.best_weight
 
-            for value in values:
-                if self.is_consistent(var, value):
-                    self.assign(var, value)
-                    backtrack()
-                    self.unassign(var)
+    def search(self, shared_bound=None, nogood_cache=None):
+        """
+        Runs the backtracking search below the current assignment, updating best_solution
+        and best_weight whenever a better complete assignment is found.
+
+        The search is iterative: an explicit stack holds one frame per decision and every
+        assignment is recorded on the trail, so backtracking is a matter of undoing the
+        trail down to the mark saved in the frame. Every decision is followed by unit
+        propagation before the next variable is selected, and every conflict on a clause adds
+        a learned clause that prunes the rest of the search.
+
+        Args:
+            shared_bound (multiprocessing.Value): Best weight found by any worker of a parallel
+                                                  solve, read and published during the search.
+                                                  Defaults to None.
+            nogood_cache (NogoodCache): Cache of assignments proven unsatisfiable. Subtrees found
+                                        in it are skipped, and subtrees exhausted without a
+                                        complete assignment or a bound cut are added to it.
+                                        Defaults to None.
+        """
+        # Bound once so that every search node avoids the attribute lookups.
+        assign_index = self.assign_index
+        var_index = self.cnf.var_index
+        var_names = self.cnf.var_names
+        undo_to = self.undo_to
+        is_satisfiable_so_far = self.is_satisfiable_so_far
+        propagate = self.propagate
+        optimistic_bound = self.optimistic_bound
+        is_complete = self.is_complete
+        select_unassigned_variable = self.select_unassigned_variable
+        least_constraining_value = self.least_constraining_value
+        use_lcv = self.use_lcv
+        trail = self.trail
+        level = self.level
+        reason = self.reason
+        start = len(trail)
+        nodes = 0
+
+        # Frames are [variable index, values to try, index of the next value, trail mark, proven],
+        # where proven stays True while every child explored so far ended in a conflict.
+        stack = []
+        self.decision_level = 0
+        entering = is_satisfiable_so_far() and self.propagate_all()
+        while True:
+            if entering and nogood_cache is not None:
+                entering = not nogood_cache.is_unsat(self.trail_literals())
+            if entering:
+                entering = False
+                nodes += 1
+                if len(self.learned) >= self.max_learned:
+                    self.reduce_learned()
+                if shared_bound is not None and nodes % SHARED_BOUND_POLL_INTERVAL == 0:
+                    if shared_bound.value > self.best_weight:
+                        # Another worker holds a better solution; ours is no longer relevant.
+                        self.best_weight = shared_bound.value
+                        self.best_solution = None
+
+                if optimistic_bound() <= self.best_weight:
+                    var = None
+                    if stack:
+                        stack[-1][4] = False
+                elif is_complete():
+                    var = None
+                    if stack:
+                        stack[-1][4] = False
+                    current_weight = self.satisfied_weight()
+                    if current_weight > self.best_weight:
+                        self.best_weight = current_weight
+                        self.best_solution = self.assignment()
+                        if shared_bound is not None:
+                            with shared_bound.get_lock():
+                                if current_weight > shared_bound.value:
+                                    shared_bound.value = current_weight
+                else:
+                    var = select_unassigned_variable()
+
+                if var is not None:
+                    if use_lcv:
+                        preferred_value = least_constraining_value(var)
+                        values = (preferred_value, not preferred_value)
+                    else:
+                        values = (True, False)
+                    stack.append([var_index[var], values, 0, len(trail), True])
+
+            if not stack:
+                break
+
+            frame = stack[-1]
+            if len(trail) > frame[3]:
+                undo_to(frame[3])
+            if frame[2] == len(frame[1]):
+                stack.pop()
+                if not frame[4]:
+                    if stack:
+                        stack[-1][4] = False
+                elif nogood_cache is not None:
+                    nogood_cache.add_unsat(self.trail_literals())
+                continue
+
+            value = frame[1][frame[2]]
+            frame[2] += 1
+            self.decision_level = len(stack)
+            assign_index(frame[0], value)
+            trail.append(frame[0])
+            level[frame[0]] = self.decision_level
+            reason[frame[0]] = None
+            entering = is_satisfiable_so_far(var_names[frame[0]]) and propagate(frame[3])
+            if not entering and self.num_violated:
+                self.add_learned_clause(self.analyze_conflict(self.conflict_clause))
+
+        undo_to(start)
+
+    def solve_parallel(self, n_workers=None):
+        """
+        Solves the CSP problem like solve(), splitting the search tree over worker processes.
+
+        The variables occurring in the most hard clauses are fixed at the root, and every
+        consistent combination of their values becomes a subproblem. There are several
+        subproblems per worker so that the pool keeps idle workers busy while others are still
+        in large subtrees. Workers share the best weight found so far to prune each other.
+
+        Args:
+            n_workers (int): Number of worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            tuple: (solution, best_weight)
+        """
+        n_workers = n_workers or os.cpu_count() or 1
+        self.best_solution = None
+        self.best_weight = -1
+        self.reset()
+
+        unassigned = self.unassigned_variables()
+        depth = min(len(unassigned), (SUBPROBLEMS_PER_WORKER * n_workers - 1).bit_length())
+        if n_workers == 1 or depth == 0:
+            nogood_cache = self.open_nogood_cache()
+            try:
+                self.search(nogood_cache=nogood_cache)
+            finally:
+                if nogood_cache is not None:
+                    nogood_cache.close()
+            return self.best_solution, self.best_weight
+
+        var_index = self.cnf.var_index
+        var_in_clause = self.cnf.var_in_clause
+        split_variables = sorted(
+            unassigned, key=lambda var: -len(var_in_clause[var_index[var]]))[:depth]
+        subproblems = []
+        for bits in range(1 << depth):
+            partial = [(var, bool(bits >> i & 1)) for i, var in enumerate(split_variables)]
+            for var, value in partial:
+                self.push_assignment(var, value)
+            if self.is_satisfiable_so_far() and self.optimistic_bound() > self.best_weight:
+                subproblems.append(partial)
+            self.undo_to(0)
+
+        nogood_cache = self.open_nogood_cache()
+        if nogood_cache is not None:
+            # The workers reopen the file; setting it up here keeps them from racing to do so.
+            nogood_cache.close()
+
+        # Fork keeps add_constraint functions usable in the workers without pickling them.
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+        shared_bound = context.Value('q', self.best_weight)
+        with ProcessPoolExecutor(n_workers, mp_context=context, initializer=init_worker,
+                                 initargs=(self, shared_bound)) as executor:
+            for solution, weight in executor.map(solve_subtree, subproblems):
+                if solution is not None and weight > self.best_weight:
+                    self.best_solution = solution
+                    self.best_weight = weight
 
-        backtrack()
         return self.best_solution, self.best_weight
+
+
+# Number of learned clauses that triggers the first reduce_learned; grows by 10% each time.
+MAX_LEARNED_CLAUSES = 2000
+# Number of search nodes between two reads of the shared bound in a parallel solve.
+SHARED_BOUND_POLL_INTERVAL = 256
+# Subproblems created per worker by solve_parallel, for load balancing.
+SUBPROBLEMS_PER_WORKER = 4
+
+worker_csp = None
+worker_shared_bound = None
+
+
+def init_worker(csp, shared_bound):
+    """
+    Stores the solver and the shared bound in a solve_parallel worker process.
+
+    Args:
+        csp (CSP): The solver to run the subproblems with.
+        shared_bound (multiprocessing.Value): Best weight found by any worker.
+    """
+    global worker_csp, worker_shared_bound
+    worker_csp = csp
+    worker_shared_bound = shared_bound
+
+
+def solve_subtree(partial):
+    """
+    Searches the subtree below a partial assignment in a solve_parallel worker process.
+
+    Args:
+        partial ([tuple]): The (variable, value) pairs fixed at the root of the subtree.
+
+    Returns:
+        tuple: (solution, weight) of the best solution found in the subtree, or (None, weight)
+               when no solution better than the shared bound exists there.
+    """
+    csp = worker_csp
+    csp.reset()
+    csp.best_solution = None
+    csp.best_weight = worker_shared_bound.value
+    for var, value in partial:
+        csp.push_assignment(var, value)
+    if csp.is_satisfiable_so_far():
+        nogood_cache = csp.open_nogood_cache()
+        try:
+            csp.search(worker_shared_bound, nogood_cache)
+        finally:
+            if nogood_cache is not None:
+                nogood_cache.close()
+    return csp.best_solution, csp.best_weight
@@ -0,0 +1,73 @@
+from array import array
+import hashlib
+import sqlite3
+
+
+class NogoodCache:
+    def __init__(self, path, signature):
+        """
+        Opens (or creates) a persistent cache of partial assignments known to be unsatisfiable.
+
+        Entries are keyed by a hash of the problem signature together with the partial
+        assignment as sorted signed literals, so one file can serve several problems and an
+        entry is only ever found again for the same hard clauses.
+
+        The connection runs in autocommit mode on a write-ahead log, so every insert is
+        committed on its own and never holds the write lock beyond it. This lets the workers
+        of a parallel solve share one file without blocking each other.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            signature (bytes): Digest identifying the hard clauses of the problem.
+        """
+        self.signature = signature
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # Switching the journal mode takes an exclusive lock, so only do it on a new file.
+        if self.connection.execute("PRAGMA journal_mode").fetchone()[0] != 'wal':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS nogoods (key BLOB PRIMARY KEY)")
+
+    def key(self, literals):
+        """
+        Builds the cache key of a partial assignment.
+
+        Args:
+            literals (iterable): The assignment as signed variable indices.
+
+        Returns:
+            bytes: The key of the assignment.
+        """
+        digest = hashlib.blake2b(self.signature, digest_size=16)
+        digest.update(array('i', sorted(literals)).tobytes())
+        return digest.digest()
+
+    def is_unsat(self, literals):
+        """
+        Checks if a partial assignment was recorded as unsatisfiable.
+
+        Args:
+            literals (iterable): The assignment as signed variable indices.
+
+        Returns:
+            bool: True if no completion of the assignment satisfies the hard clauses.
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM nogoods WHERE key = ?", (self.key(literals),)).fetchone()
+        return row is not None
+
+    def add_unsat(self, literals):
+        """
+        Records a partial assignment as unsatisfiable.
+
+        Args:
+            literals (iterable): The assignment as signed variable indices.
+        """
+        self.connection.execute(
+            "INSERT OR IGNORE INTO nogoods (key) VALUES (?)", (self.key(literals),))
+
+    def close(self):
+        """
+        Closes the database. Entries are already committed when they are added.
+        """
+        self.connection.close()
@@ -96,7 +96,7 @@ class UI(QWidget):
     def read_test_case(self, filename):
         hard_clauses = []
         soft_clauses = []
-        variables = []
+        variables = set()
         with open(filename, 'r') as f:
             lines = f.readlines()
             cnt_hard_clauses = 0
@@ -115,21 +115,14 @@ class UI(QWidget):
                     hard_clauses.append(line_vars)
                     cnt_hard_clauses += 1
             for clause in hard_clauses:
-                for variable in clause:
-                    negation = variable[1:] if '~' in variable else str(
-                        '~' + variable)
-                    variables.append(variable)
-                    variables.append(negation)
+                for literal in clause:
+                    variables.add(CNF.parse_literal(literal)[0])
             for _clause in soft_clauses:
                 clause = _clause[:-1]
-                for variable in clause:
-                    negation = variable[1:] if '~' in variable else str(
-                        '~' + variable)
-                    variables.append(variable)
-                    variables.append(negation)
-
-            variables = set(variables)
-            if len(variables) != 2 * num_vars or len(hard_clauses) != num_hard_clauses or len(soft_clauses) != num_soft_clauses:
+                for literal in clause:
+                    variables.add(CNF.parse_literal(literal)[0])
+
+            if len(variables) != num_vars or len(hard_clauses) != num_hard_clauses or len(soft_clauses) != num_soft_clauses:
                 return (None, None, None)
         return (variables, hard_clauses, soft_clauses)
 
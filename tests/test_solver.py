@@ -0,0 +1,194 @@
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cnf import CNF
+import csp as csp_module
+from csp import CSP
+from nogood_cache import NogoodCache
+
+
+def random_instance(rng, num_vars, num_hard, num_soft, max_size=3):
+    """
+    Generates a random weighted MaxSAT instance in the string form read by the UI.
+    Hard clauses have at least two literals; soft clauses may be units.
+
+    Returns:
+        tuple: (variables, hard_clauses, soft_clauses)
+    """
+    variables = [f'X{i}' for i in range(1, num_vars + 1)]
+
+    def clause(min_size):
+        return sorted({rng.choice(('', '~')) + rng.choice(variables)
+                       for _ in range(rng.randint(min_size, max_size))})
+
+    hard_clauses = [clause(2) for _ in range(num_hard)]
+    soft_clauses = [clause(1) + [str(rng.randint(1, 10))] for _ in range(num_soft)]
+    return variables, hard_clauses, soft_clauses
+
+
+def is_satisfied(clause, assignment):
+    return any(assignment.get(literal.lstrip('~'), False) != literal.startswith('~')
+               for literal in clause)
+
+
+def weight_of(soft_clauses, assignment):
+    return sum(int(soft_clause[-1]) for soft_clause in soft_clauses
+               if is_satisfied(soft_clause[:-1], assignment))
+
+
+def models(variables, hard_clauses, fixed=None):
+    """
+    Lists the assignments extending fixed that satisfy the hard clauses.
+
+    Returns:
+        [dict]: The satisfying assignments.
+    """
+    fixed = fixed or {}
+    free = [var for var in variables if var not in fixed]
+    found = []
+    for values in itertools.product((False, True), repeat=len(free)):
+        assignment = dict(fixed, **dict(zip(free, values)))
+        if all(is_satisfied(clause, assignment) for clause in hard_clauses):
+            found.append(assignment)
+    return found
+
+
+def brute_force(variables, hard_clauses, soft_clauses, fixed=None):
+    """
+    Returns:
+        int: The best weight over the models extending fixed, or -1 if there is none.
+    """
+    return max((weight_of(soft_clauses, assignment)
+                for assignment in models(variables, hard_clauses, fixed)), default=-1)
+
+
+HEURISTICS = [(False, False, False), (True, False, True), (False, True, True), (False, True, False)]
+
+
+class SolverTest(unittest.TestCase):
+    def check_solution(self, instance, solution, weight):
+        variables, hard_clauses, soft_clauses = instance
+        self.assertEqual(weight, brute_force(*instance))
+        if weight < 0:
+            self.assertIsNone(solution)
+            return
+        self.assertTrue(all(is_satisfied(clause, solution) for clause in hard_clauses))
+        self.assertEqual(weight_of(soft_clauses, solution), weight)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(16)
+        for _ in range(40):
+            instance = random_instance(rng, 10, rng.randint(10, 35), 12)
+            for use_mcv, use_mrv, use_lcv in HEURISTICS:
+                with self.subTest(instance=instance, heuristics=(use_mcv, use_mrv, use_lcv)):
+                    csp = CSP(CNF(*instance), use_mcv, use_mrv, use_lcv)
+                    self.check_solution(instance, *csp.solve())
+
+    def test_matches_brute_force_with_tiny_learned_clause_limit(self):
+        # Forces reduce_learned to run many times per solve.
+        rng = random.Random(3)
+        with mock.patch.object(csp_module, 'MAX_LEARNED_CLAUSES', 3), \
+                mock.patch.object(CSP, 'reduce_learned', autospec=True,
+                                  side_effect=CSP.reduce_learned) as reduce_learned:
+            for _ in range(40):
+                instance = random_instance(rng, 12, rng.randint(25, 45), 12)
+                for use_mcv, use_mrv, use_lcv in HEURISTICS:
+                    with self.subTest(instance=instance, heuristics=(use_mcv, use_mrv, use_lcv)):
+                        csp = CSP(CNF(*instance), use_mcv, use_mrv, use_lcv)
+                        self.check_solution(instance, *csp.solve())
+        self.assertGreater(reduce_learned.call_count, 0)
+
+    def test_learned_clauses_follow_from_hard_clauses(self):
+        rng = random.Random(16)
+        num_learned = 0
+        for _ in range(40):
+            instance = random_instance(rng, 12, rng.randint(25, 45), 12)
+            cnf = CNF(*instance)
+            csp = CSP(cnf, False, True, True)
+            with mock.patch.object(csp, 'add_learned_clause',
+                                   side_effect=csp.add_learned_clause) as add_learned_clause:
+                csp.solve()
+            satisfying = models(instance[0], instance[1])
+            for call in add_learned_clause.call_args_list:
+                clause = [cnf.var_names[lit] if lit > 0 else '~' + cnf.var_names[-lit]
+                          for lit in call.args[0]]
+                with self.subTest(instance=instance, clause=clause):
+                    self.assertTrue(all(is_satisfied(clause, model) for model in satisfying))
+                num_learned += 1
+        self.assertGreater(num_learned, 0)
+
+    def test_optimistic_bound_is_an_upper_bound(self):
+        # Many unit soft clauses, so both polarities of a variable are often decided alone.
+        rng = random.Random(23)
+        for _ in range(60):
+            instance = random_instance(rng, 9, rng.randint(5, 20), 16, max_size=2)
+            variables, hard_clauses, soft_clauses = instance
+            csp = CSP(CNF(*instance), False, False, False)
+            fixed = {var: rng.random() < 0.5 for var in rng.sample(variables, rng.randint(0, 6))}
+            for var, value in fixed.items():
+                csp.push_assignment(var, value)
+            with self.subTest(instance=instance, fixed=fixed):
+                self.assertGreaterEqual(csp.optimistic_bound(),
+                                        brute_force(variables, hard_clauses, soft_clauses, fixed))
+
+    def test_optimistic_bound_charges_conflicting_unit_soft_clauses(self):
+        cnf = CNF(['X1', 'X2'], [['X1', 'X2']], [['X1', '3'], ['~X1', '5'], ['X2', '4']])
+        csp = CSP(cnf, False, False, False)
+        self.assertEqual(csp.optimistic_bound(), 9)
+        csp.push_assignment('X2', False)
+        self.assertEqual(csp.optimistic_bound(), 5)
+        # Propagating the hard clause sets X1 and falsifies ~X1.
+        self.assertTrue(csp.propagate_all())
+        self.assertEqual(csp.optimistic_bound(), 3)
+
+    def test_parallel_solve_with_nogood_cache(self):
+        # Large enough for brute force to be slow, and some workers record nogoods.
+        instance = random_instance(random.Random(0), 20, 60, 30, max_size=4)
+        expected = CSP(CNF(*instance), False, True, True).solve()[1]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'nogoods.db')
+            for _ in range(2):
+                csp = CSP(CNF(*instance), False, True, True, nogood_cache_path=path)
+                solution, weight = csp.solve_parallel(4)
+                self.assertEqual(weight, expected)
+                self.assertTrue(all(is_satisfied(clause, solution) for clause in instance[1]))
+                self.assertEqual(weight_of(instance[2], solution), weight)
+            with sqlite3.connect(path) as connection:
+                count = connection.execute("SELECT COUNT(*) FROM nogoods").fetchone()[0]
+            self.assertGreater(count, 0)
+
+    def test_single_worker_solve_uses_nogood_cache(self):
+        instance = random_instance(random.Random(0), 20, 60, 30, max_size=4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'nogoods.db')
+            csp = CSP(CNF(*instance), False, True, True, nogood_cache_path=path)
+            result = csp.solve_parallel(1)
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(result, csp.solve())
+
+    def test_nogood_cache_writers_do_not_block(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'nogoods.db')
+            first = NogoodCache(path, b'signature')
+            second = NogoodCache(path, b'signature')
+            second.connection.execute("PRAGMA busy_timeout=100")
+            try:
+                first.add_unsat([1, -2])
+                second.add_unsat([3])
+                self.assertTrue(second.is_unsat([-2, 1]))
+                self.assertTrue(first.is_unsat([3]))
+            finally:
+                first.close()
+                second.close()
+
+
+if __name__ == '__main__':
+    unittest.main()